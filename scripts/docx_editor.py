@@ -9,10 +9,15 @@ DocxEditor - LLM 原子化 Word 编辑工具
 
 段落：
     get_outline()           获取大纲
+    iter_outline()          逐个读取大纲标题（惰性）
     read_content(indices)   读取段落
+    iter_content(indices)   逐段读取段落详情（惰性）
+    iter_summaries(indices) 逐段读取段落摘要（文本/样式/是否为空/是否有编号）
+    paragraph_count         段落总数
 
 表格：
     get_tables_outline()    获取表格概览
+    iter_tables_outline()   逐个读取表格概览（惰性）
     read_table(table_index) 读取表格内容
 
 图片：
@@ -22,6 +27,8 @@ DocxEditor - LLM 原子化 Word 编辑工具
     batch_update(ops)       批量修改（自动倒序）
     save(path)              保存
 
+注意：iter_* 为生成器，迭代时才读取文档，迭代期间不要修改文档（如调用 batch_update）。
+
 示例：
     from docx_editor import DocxEditor
     editor = DocxEditor('input.docx')
@@ -47,11 +54,121 @@ from docx import Document
 from docx.shared import Pt, Cm, Inches
 from docx.enum.text import WD_ALIGN_PARAGRAPH
 from docx.enum.shape import WD_INLINE_SHAPE_TYPE
-from docx.oxml.ns import qn
+from docx.enum.style import WD_STYLE_TYPE
+from docx.oxml.ns import qn, nsmap
 from docx.oxml import OxmlElement
+from docx.text.paragraph import Paragraph
+from docx.table import Table
+from docx.shape import InlineShape
+from lxml import etree
 import re
 import os
-from typing import Optional, List, Dict, Union
+import sys
+from functools import lru_cache
+from operator import itemgetter
+from typing import Optional, List, Dict, Tuple, Union, Iterator, NamedTuple
+
+# 常用 XML 限定名（预先计算，避免在循环中反复调用 qn()）
+_QN_P = qn('w:p')
+_QN_TBL = qn('w:tbl')
+_QN_PPR = qn('w:pPr')
+_QN_NUMPR = qn('w:numPr')
+_QN_DRAWING = qn('w:drawing')
+_QN_OBJECT = qn('w:object')
+_QN_EASTASIA = qn('w:eastAsia')
+_QN_UPDATEFIELDS = qn('w:updateFields')
+_QN_PSTYLE = qn('w:pStyle')
+_QN_HYPERLINK = qn('w:hyperlink')
+_QN_VAL = qn('w:val')
+_PSTYLE_PATH = _QN_PPR + '/' + _QN_PSTYLE
+_QN_EXTENT = qn('wp:extent')
+
+# 段落中出现即视为嵌入对象的标签：图片（drawing）与 OLE 对象
+_EMBED_TAGS = frozenset((_QN_DRAWING, _QN_OBJECT))
+
+# 1 厘米 = 360000 EMU
+_EMU_PER_CM = 360000
+
+# 保存时的文件写缓冲大小（1 MiB）
+_SAVE_BUFFER_SIZE = 1 << 20
+
+# 写入段落后读回会变化或写入会失败的字符：\r（写成 <w:br/>，读回为 \n）及 XML 非法字符
+_UNSTABLE_TEXT = re.compile('[\x00-\x08\x0b\x0c\r\x0e-\x1f\ud800-\udfff\ufffe\uffff]')
+
+# 段落对齐方式 -> 字符串
+_ALIGN_MAP = {
+    WD_ALIGN_PARAGRAPH.LEFT: 'left',
+    WD_ALIGN_PARAGRAPH.CENTER: 'center',
+    WD_ALIGN_PARAGRAPH.RIGHT: 'right',
+    WD_ALIGN_PARAGRAPH.JUSTIFY: 'justify',
+}
+
+# 内置标题样式名称 -> 级别（常见情况直接查表，无需解析名称）
+_HEADING_LEVELS = {f'Heading {n}': n for n in range(1, 10)}
+
+# 按样式 ID 集合筛选子段落（$ids 形如 "|Heading1|Heading2|"），遍历在 lxml 的 C 层完成
+_XP_STYLED_PARAGRAPHS = etree.XPath(
+    'w:p[contains($ids, concat("|", w:pPr/w:pStyle/@w:val, "|"))]',
+    namespaces={'w': nsmap['w']}
+)
+
+# 文档中所有内嵌图片（与 python-docx 的 inline_shapes 取值一致）
+_XP_INLINE_SHAPES = etree.XPath(
+    '//w:p/w:r/w:drawing/wp:inline',
+    namespaces={'w': nsmap['w'], 'wp': nsmap['wp']}
+)
+
+# 段落文本节点：与 CT_P.text 取值范围一致（直属 run 与超链接内 run 中的文本、制表符、换行等），
+# 按文档顺序返回，str() 即为各节点对应的文本
+_XP_TEXT_NODES = etree.XPath(
+    '(w:r | w:hyperlink/w:r)/*[self::w:t or self::w:tab or self::w:br or self::w:cr'
+    ' or self::w:noBreakHyphen or self::w:ptab]',
+    namespaces={'w': nsmap['w']}
+)
+
+
+def _paragraph_text(p) -> str:
+    """段落文本（结果同 CT_P.text，但只执行一次预编译 XPath）"""
+    return ''.join(map(str, _XP_TEXT_NODES(p)))
+
+
+@lru_cache(maxsize=None)
+def _qn_w(tag: str) -> str:
+    """w 命名空间下任意标签的限定名（带缓存，用于动态标签）"""
+    return qn(f'w:{tag}')
+
+
+class _LiteralPattern:
+    """非正则模式：提供与编译后正则相同的 search/sub 接口，按字面量匹配和替换"""
+
+    __slots__ = ('pattern',)
+
+    def __init__(self, pattern: str):
+        self.pattern = pattern
+
+    def search(self, text: str) -> bool:
+        return self.pattern in text
+
+    def sub(self, replacement: str, text: str) -> str:
+        return text.replace(self.pattern, replacement)
+
+
+@lru_cache(maxsize=256)
+def _compile_pattern(pattern: str, regex: bool):
+    """编译替换模式（带缓存，同一批次中相同模式只编译一次）"""
+    if regex:
+        return re.compile(pattern)
+    return _LiteralPattern(pattern)
+
+
+class ParagraphSummary(NamedTuple):
+    """段落摘要（轻量只读记录，字段与 read_content 结果中的同名字段一致，不含 runs/format 等详情）"""
+    index: int
+    text: str
+    style: str                  # 样式名称，未知时为 'Normal'
+    style_name: Optional[str]   # 样式名称原值（对应 read_content 的 xml.style_name）
+    is_empty: bool
+    has_numPr: bool
 
 
 class DocxEditor:
@@ -60,13 +177,74 @@ class DocxEditor:
     def __init__(self, file_path: str):
         self.file_path = file_path
         self.doc = Document(file_path)
-        self._refresh()
+        self._invalidate()
+        # pStyle 值 -> 样式名称（样式定义不随编辑变化，无需失效）
+        self._style_name_cache = {}
+        self._style_levels_cache = None
+
+        # 操作分发表：op 名称 -> 处理函数，避免逐个 if/elif 比较
+        self._handlers = {
+            'delete': self._dispatch_delete,
+            'insert': self._dispatch_insert,
+            'update_style': self._dispatch_update_style,
+            'replace_text': self._dispatch_replace_text,
+            'replace_text_global': self._dispatch_replace_text_global,
+            'clean_xml': self._dispatch_clean_xml,
+            'set_text': self._dispatch_set_text,
+            # 表格操作
+            'update_table_cell': self._dispatch_update_table_cell,
+            'replace_table_cell': self._dispatch_replace_table_cell,
+            'update_table_row': self._dispatch_update_table_row,
+            'update_table_col': self._dispatch_update_table_col,
+            # 图片操作
+            'delete_image': self._dispatch_delete_image,
+            'resize_image': self._dispatch_resize_image,
+            'insert_image': self._dispatch_insert_image,
+            # 引用刷新
+            'update_fields_on_open': self._dispatch_update_fields_on_open,
+        }
 
-    def _refresh(self):
-        """刷新段落、表格、图片索引"""
-        self._paragraphs = list(self.doc.paragraphs)
-        self._tables = list(self.doc.tables)
-        self._images = list(self.doc.inline_shapes)
+    def _invalidate(self):
+        """清空段落、表格、图片索引，下次访问时按需重建"""
+        self._p_elements_cache = None
+        self._tables_cache = None
+        self._images_cache = None
+        self._headings_cache = None
+        # 段落元素 -> 是否真正为空（读取时记录，删除检查时复用）
+        self._truly_empty_cache = {}
+
+    @property
+    def _p_elements(self) -> List:
+        """段落 <w:p> 元素列表（首次访问时构建，不构造 Paragraph 对象）"""
+        if self._p_elements_cache is None:
+            self._p_elements_cache = list(self.doc.element.body.iterchildren(_QN_P))
+        return self._p_elements_cache
+
+    @property
+    def paragraph_count(self) -> int:
+        """段落总数"""
+        return len(self._p_elements)
+
+    def _paragraph(self, index: int) -> Paragraph:
+        """按需为指定段落构造 Paragraph 对象"""
+        return Paragraph(self._p_elements[index], self.doc._body)
+
+    @property
+    def _tables(self) -> List:
+        """表格列表（首次访问时构建）"""
+        if self._tables_cache is None:
+            # 只取正文顶层表格（同 doc.tables），直接遍历 <w:tbl> 子元素
+            body = self.doc._body
+            self._tables_cache = [Table(tbl, body) for tbl in body._element.iterchildren(_QN_TBL)]
+        return self._tables_cache
+
+    @property
+    def _images(self) -> List:
+        """图片列表（首次访问时构建）"""
+        if self._images_cache is None:
+            # 预编译 XPath 只查询一次（list(doc.inline_shapes) 会因取长度再查询一遍）
+            self._images_cache = [InlineShape(inline) for inline in _XP_INLINE_SHAPES(self.doc.element.body)]
+        return self._images_cache
 
     # ==================== 查询层（Read）====================
 
@@ -86,21 +264,24 @@ class DocxEditor:
                 ]
             }
         """
-        headings = []
-        for i, para in enumerate(self._paragraphs):
-            level = self._get_heading_level(para)
-            if level and para.text.strip():
-                headings.append({
-                    'index': i,
-                    'level': level,
-                    'text': para.text.strip()[:100]
-                })
-
+        total, _ = self._get_heading_index()
         return {
-            'total': len(self._paragraphs),
-            'headings': headings
+            'total': total,
+            'headings': list(self.iter_outline())
         }
 
+    def iter_outline(self) -> Iterator[Dict]:
+        """逐个生成 get_outline 中的标题条目（惰性，只需前几个标题时无需构造全部字典）"""
+        _, heading_index = self._get_heading_index()
+        for i, level, text in heading_index:
+            text = text.strip()
+            if text:
+                yield {
+                    'index': i,
+                    'level': level,
+                    'text': text[:100]
+                }
+
     def read_content(self, indices: Union[int, List[int], range, str]) -> List[Dict]:
         """
         按需读取指定段落详情
@@ -137,36 +318,34 @@ class DocxEditor:
                 }
             ]
         """
-        # 解析 indices
-        if isinstance(indices, int):
-            idx_list = [indices]
-        elif isinstance(indices, str):
-            # 按章节标题查找
-            idx_list = self._get_section_indices(indices)
-        elif isinstance(indices, range):
-            idx_list = list(indices)
-        else:
-            idx_list = list(indices)
+        return list(self.iter_content(indices))
 
-        results = []
-        for i in idx_list:
-            if not 0 <= i < len(self._paragraphs):
-                continue
+    def iter_content(self, indices: Union[int, List[int], range, str]) -> Iterator[Dict]:
+        """
+        逐段生成 read_content 的结果（惰性，按需读取）
 
-            para = self._paragraphs[i]
+        生成器在迭代时才读取段落，迭代期间不要修改文档。
+        """
+        for i, para in self._iter_paragraphs(indices):
+            summary = self._summarize(i, para)
             pf = para.paragraph_format
             level = self._get_heading_level(para)
 
-            # 获取 runs 详情
+            # 获取 runs 详情（直接读取 <w:r>/<w:rPr>，不构造 Run/Font 对象）
             runs = []
-            for r in para.runs:
+            for r in para._element.r_lst:
+                rPr = r.rPr
+                if rPr is None:
+                    runs.append({'text': r.text, 'bold': None, 'italic': None})
+                    continue
                 run_info = {
                     'text': r.text,
-                    'bold': r.bold,
-                    'italic': r.italic,
+                    'bold': rPr._get_bool_val('b'),
+                    'italic': rPr._get_bool_val('i'),
                 }
-                if r.font.size:
-                    run_info['font_size'] = r.font.size.pt
+                size = rPr.sz_val
+                if size:
+                    run_info['font_size'] = size.pt
                 runs.append(run_info)
 
             # 获取格式
@@ -174,45 +353,87 @@ class DocxEditor:
                 'alignment': self._alignment_to_str(para.alignment),
                 'line_spacing': pf.line_spacing,
             }
-            if pf.first_line_indent:
-                fmt['first_line_indent'] = round(pf.first_line_indent.cm, 2) if hasattr(pf.first_line_indent, 'cm') else None
-            if pf.left_indent:
-                fmt['left_indent'] = round(pf.left_indent.cm, 2) if hasattr(pf.left_indent, 'cm') else None
+            # 缩进值要么为 None，要么是 Length（始终可转厘米）
+            first_line_indent = pf.first_line_indent
+            if first_line_indent:
+                fmt['first_line_indent'] = round(first_line_indent.cm, 2)
+            left_indent = pf.left_indent
+            if left_indent:
+                fmt['left_indent'] = round(left_indent.cm, 2)
 
             # 获取 XML 级别信息
             xml_info = {
-                'has_numPr': False,
-                'style_name': para.style.name if para.style else None
+                'has_numPr': summary.has_numPr,
+                'style_name': summary.style_name
             }
-            pPr = para._element.pPr
-            if pPr is not None:
-                if pPr.find(qn('w:numPr')) is not None:
-                    xml_info['has_numPr'] = True
 
             # 检查段落是否包含嵌入对象（图片、OLE对象等）
             # 这些内容不会体现在 text 属性中，但删除段落会一并删除
-            drawings = para._element.findall('.//' + qn('w:drawing'))
-            objects = para._element.findall('.//' + qn('w:object'))
-            has_embedded = len(drawings) > 0 or len(objects) > 0
+            # 与 is_truly_empty 共用同一次遍历
+            has_embedded, has_any_embedded = self._scan_embedded(para._element)
 
             # is_truly_empty: 真正为空（无文字且无嵌入对象），可安全删除
-            truly_empty = self._is_truly_empty(para)
+            truly_empty = summary.is_empty and not has_any_embedded
+            self._truly_empty_cache[para._element] = truly_empty
 
-            results.append({
+            yield {
                 'index': i,
-                'text': para.text,
-                'style': para.style.name if para.style else 'Normal',
+                'text': summary.text,
+                'style': summary.style,
                 'is_heading': level is not None,
                 'heading_level': level,
-                'is_empty': not para.text.strip(),  # 文本为空（可能包含图片）
+                'is_empty': summary.is_empty,        # 文本为空（可能包含图片）
                 'is_truly_empty': truly_empty,       # 真正为空（可安全删除）
                 'has_embedded': has_embedded,        # 是否包含图片/OLE等嵌入对象
                 'runs': runs,
                 'format': fmt,
                 'xml': xml_info
-            })
+            }
 
-        return results
+    def iter_summaries(self, indices: Union[int, List[int], range, str]) -> Iterator[ParagraphSummary]:
+        """
+        逐段生成段落摘要（惰性，只读取文本、样式、是否为空、是否有编号）
+
+        参数同 read_content；各字段与 read_content 结果一致，迭代期间不要修改文档。
+        """
+        for i, para in self._iter_paragraphs(indices):
+            yield self._summarize(i, para)
+
+    def _iter_paragraphs(self, indices: Union[int, List[int], range, str]) -> Iterator[Tuple[int, Paragraph]]:
+        """按 indices 逐个生成 (索引, Paragraph)，跳过越界索引"""
+        p_elements = self._p_elements
+        body = self.doc._body
+        total = len(p_elements)
+        for i in self._resolve_indices(indices):
+            if 0 <= i < total:
+                yield i, Paragraph(p_elements[i], body)
+
+    def _summarize(self, index: int, para: Paragraph) -> ParagraphSummary:
+        """段落摘要（iter_content 与 iter_summaries 共用，保证两者字段一致）"""
+        p = para._element
+        text = para.text
+        style_name = self._style_name(p)
+        pPr = p.pPr
+        return ParagraphSummary(
+            index=index,
+            text=text,
+            style=style_name if style_name is not None else 'Normal',
+            style_name=style_name,
+            is_empty=not text.strip(),
+            has_numPr=pPr is not None and pPr.find(_QN_NUMPR) is not None,
+        )
+
+    def _resolve_indices(self, indices: Union[int, List[int], range, str]):
+        """解析 indices 参数为可迭代的段落索引"""
+        if isinstance(indices, int):
+            return [indices]
+        if isinstance(indices, str):
+            # 按章节标题查找
+            return self._get_section_indices(indices)
+        if isinstance(indices, range):
+            # range 直接迭代，无需展开成列表
+            return indices
+        return list(indices)
 
     # ==================== 表格查询层 ====================
 
@@ -230,28 +451,29 @@ class DocxEditor:
                 }
             ]
         """
-        results = []
+        return list(self.iter_tables_outline())
+
+    def iter_tables_outline(self) -> Iterator[Dict]:
+        """逐个生成 get_tables_outline 中的表格条目（惰性）"""
         for i, table in enumerate(self._tables):
             rows = len(table.rows)
             cols = len(table.columns) if table.rows else 0
 
             # 获取预览（第一个单元格的文本）
             preview = ''
-            if rows > 0 and cols > 0:
+            if rows and cols:
                 try:
                     cell_text = table.cell(0, 0).text.strip()
                     preview = cell_text[:50] + ('...' if len(cell_text) > 50 else '')
                 except:
                     pass
 
-            results.append({
+            yield {
                 'table_index': i,
                 'rows': rows,
                 'cols': cols,
                 'preview': preview
-            })
-
-        return results
+            }
 
     def read_table(self, table_index: int) -> Dict:
         """
@@ -280,15 +502,32 @@ class DocxEditor:
         rows = len(table.rows)
         cols = len(table.columns) if table.rows else 0
 
-        # 读取所有单元格内容
+        # 直接遍历 <w:tr>/<w:tc> 读取单元格内容，不构造 Cell/Paragraph 对象，展开规则同 row.cells：
+        # 单元格按其跨列数重复；纵向合并的延续单元格取上一行中起始列相同的单元格
+        # （逐行追溯到合并起点），按起点单元格的文本和跨列数展开，而不是延续单元格自身的跨列数
         data = []
-        for row in table.rows:
+        above = None  # 上一行：起始网格列偏移 -> (起点单元格文本, 起点单元格跨列数)
+        for tr in table._tbl.tr_lst:
             row_data = []
-            for cell in row.cells:
-                # 单元格可能包含多个段落，用换行连接
-                cell_text = '\n'.join(p.text for p in cell.paragraphs)
-                row_data.append(cell_text)
+            starts = {}
+            offset = tr.grid_before
+            for tc in tr.tc_lst:
+                if tc.vMerge == 'continue':
+                    if above is None:
+                        raise ValueError("no tr above topmost tr in w:tbl")
+                    try:
+                        root = above[offset]
+                    except KeyError:
+                        raise ValueError(f"no `tc` element at grid_offset={offset}") from None
+                else:
+                    # 单元格可能包含多个段落，用换行连接
+                    root = ('\n'.join(p.text for p in tc.iterchildren(_QN_P)), tc.grid_span)
+                starts[offset] = root
+                cell_text, root_span = root
+                row_data.extend([cell_text] * root_span)
+                offset += tc.grid_span
             data.append(row_data)
+            above = starts
 
         return {
             'table_index': table_index,
@@ -328,8 +567,9 @@ class DocxEditor:
                 shape_type = 'linked_picture'
 
             # 获取尺寸（EMU转厘米）
-            width_cm = round(shape.width / 914400 * 2.54, 2) if shape.width else None
-            height_cm = round(shape.height / 914400 * 2.54, 2) if shape.height else None
+            cx, cy = self._image_extent(shape)
+            width_cm = round(cx / _EMU_PER_CM, 2) if cx else None
+            height_cm = round(cy / _EMU_PER_CM, 2) if cy else None
 
             results.append({
                 'image_index': i,
@@ -432,146 +672,224 @@ class DocxEditor:
         """
         # 按 index 倒序排列（防止索引漂移）
         # insert 和 delete 会改变后续索引，所以从后往前执行
-        sorted_ops = sorted(
-            operations,
-            key=lambda x: x.get('index', float('inf')),
-            reverse=True
-        )
+        # 无 index 的操作（全局替换、表格、图片等）保持原顺序，先于段落操作执行，
+        # 使 table_index/image_index 仍对应修改前的文档
+        indexed = []
+        unindexed = []
+        for op in operations:
+            if op.get('index') is None:
+                unindexed.append(op)
+            else:
+                indexed.append(op)
+        indexed.sort(key=itemgetter('index'), reverse=True)
+        sorted_ops = unindexed + indexed
 
         results = {'success': 0, 'failed': 0, 'details': []}
 
-        for op in sorted_ops:
+        pos = 0
+        while pos < len(sorted_ops):
+            # 可合并执行的连续操作（相邻删除、连续全局替换），结果仍逐个记录
+            fused = self._run_fused(sorted_ops, pos, results)
+            if fused:
+                if sorted_ops[pos].get('op') != 'delete':
+                    self._truly_empty_cache.clear()
+                pos += fused
+                continue
+
+            op = sorted_ops[pos]
+            pos += 1
             op_type = op.get('op', '')
-            index = op.get('index')
-            detail = {'op': op_type, 'index': index, 'status': 'ok'}
+            detail = {'op': op_type, 'index': op.get('index'), 'status': 'ok'}
+
+            handler = self._handlers.get(op_type)
+            if handler is None:
+                self._record_result(results, detail, f'未知操作类型: {op_type}')
+                continue
 
             try:
-                if op_type == 'delete':
-                    self._op_delete(index, force=op.get('force', False))
-
-                elif op_type == 'insert':
-                    new_idx = self._op_insert(
-                        index,
-                        op.get('text', ''),
-                        op.get('position', 'after'),
-                        op.get('style')
-                    )
-                    detail['new_index'] = new_idx
-
-                elif op_type == 'update_style':
-                    self._op_update_style(index, op)
-
-                elif op_type == 'replace_text':
-                    changed = self._op_replace_text(
-                        index,
-                        op.get('pattern', ''),
-                        op.get('replacement', ''),
-                        op.get('regex', True)
-                    )
-                    detail['changed'] = changed
-
-                elif op_type == 'replace_text_global':
-                    count = self._op_replace_text_global(
-                        op.get('pattern', ''),
-                        op.get('replacement', ''),
-                        op.get('regex', False)
-                    )
+                handler(op, detail)
+                error = None
+            except Exception as e:
+                error = e
+            self._record_result(results, detail, error)
+            if op_type != 'delete':
+                # 删除之外的修改可能改变段落内容，空段落判断需重新计算
+                self._truly_empty_cache.clear()
+
+        # 修改可能改变段落样式/文本，也可能连带删除图片（如改写含图片的段落或单元格），
+        # 标题和图片索引下次访问时重建
+        self._headings_cache = None
+        self._images_cache = None
+        self._truly_empty_cache.clear()
+
+        return results
+
+    def save(self, path: Optional[str] = None):
+        """保存文档"""
+        target = path or self.file_path
+        if not isinstance(target, (str, os.PathLike)):
+            # 已是文件对象（如 BytesIO），直接写入
+            self.doc.save(target)
+            return
+
+        # 使用大块写缓冲，避免压缩包逐条目写入时产生大量小块系统调用
+        with open(target, 'wb', buffering=_SAVE_BUFFER_SIZE) as f:
+            self.doc.save(f)
+
+    # ==================== 操作分发 ====================
+
+    def _run_fused(self, ops: List[Dict], pos: int, results: Dict) -> int:
+        """
+        合并执行从 pos 开始的连续同类操作，结果仍逐个记录
+
+        - 相邻索引的删除：一次性移除
+        - 连续的全局替换：只遍历一次段落
+
+        Returns:
+            合并执行的操作数（不足两个时返回 0，交由逐个执行）
+        """
+        run_len = self._delete_run_length(ops, pos)
+        if run_len > 1:
+            run = ops[pos:pos + run_len]
+            errors = self._op_delete_range(
+                run[-1]['index'],
+                run[0]['index'] + 1,
+                force=bool(run[0].get('force', False))
+            )
+            for op, error in zip(run, errors):
+                detail = {'op': 'delete', 'index': op['index'], 'status': 'ok'}
+                self._record_result(results, detail, error)
+            return run_len
+
+        end = pos
+        while end < len(ops) and ops[end].get('op') == 'replace_text_global':
+            end += 1
+        if end - pos > 1:
+            run = ops[pos:end]
+            outcomes = self._replace_text_global_many([
+                (op.get('pattern', ''), op.get('replacement', ''), op.get('regex', False))
+                for op in run
+            ])
+            for op, (count, error) in zip(run, outcomes):
+                detail = {'op': 'replace_text_global', 'index': op.get('index'), 'status': 'ok'}
+                if error is None:
                     detail['replaced_count'] = count
+                self._record_result(results, detail, error)
+            return end - pos
 
-                elif op_type == 'clean_xml':
-                    self._op_clean_xml(index, op)
-
-                elif op_type == 'set_text':
-                    self._op_set_text(index, op.get('text', ''))
-
-                # ===== 表格操作 =====
-                elif op_type == 'update_table_cell':
-                    self._op_update_table_cell(
-                        op.get('table_index'),
-                        op.get('row'),
-                        op.get('col'),
-                        op.get('text', '')
-                    )
-                    detail['table_index'] = op.get('table_index')
-                    detail['row'] = op.get('row')
-                    detail['col'] = op.get('col')
-
-                elif op_type == 'replace_table_cell':
-                    changed = self._op_replace_table_cell(
-                        op.get('table_index'),
-                        op.get('row'),
-                        op.get('col'),
-                        op.get('pattern', ''),
-                        op.get('replacement', ''),
-                        op.get('regex', False)
-                    )
-                    detail['table_index'] = op.get('table_index')
-                    detail['changed'] = changed
-
-                elif op_type == 'update_table_row':
-                    self._op_update_table_row(
-                        op.get('table_index'),
-                        op.get('row'),
-                        op.get('texts', [])
-                    )
-                    detail['table_index'] = op.get('table_index')
-                    detail['row'] = op.get('row')
-
-                elif op_type == 'update_table_col':
-                    self._op_update_table_col(
-                        op.get('table_index'),
-                        op.get('col'),
-                        op.get('texts', [])
-                    )
-                    detail['table_index'] = op.get('table_index')
-                    detail['col'] = op.get('col')
-
-                # ===== 图片操作 =====
-                elif op_type == 'delete_image':
-                    self._op_delete_image(op.get('image_index'))
-                    detail['image_index'] = op.get('image_index')
-
-                elif op_type == 'resize_image':
-                    self._op_resize_image(
-                        op.get('image_index'),
-                        op.get('width'),
-                        op.get('height')
-                    )
-                    detail['image_index'] = op.get('image_index')
-
-                elif op_type == 'insert_image':
-                    self._op_insert_image(
-                        index,
-                        op.get('path', ''),
-                        op.get('width'),
-                        op.get('height')
-                    )
-
-                # ===== 引用刷新 =====
-                elif op_type == 'update_fields_on_open':
-                    self._op_update_fields_on_open()
+        return 0
 
-                else:
-                    detail['status'] = 'error'
-                    detail['error'] = f'未知操作类型: {op_type}'
-                    results['failed'] += 1
-                    results['details'].append(detail)
-                    continue
+    @staticmethod
+    def _record_result(results: Dict, detail: Dict, error):
+        """记录单个操作的执行结果（error 为 None 表示成功）"""
+        if error is None:
+            results['success'] += 1
+        else:
+            detail['status'] = 'error'
+            detail['error'] = str(error)
+            results['failed'] += 1
+        results['details'].append(detail)
+
+    # 每个处理函数接收 (op, detail)：从 op 取参数调用 _op_*，并把结果写入 detail
+
+    def _dispatch_delete(self, op: Dict, detail: Dict):
+        self._op_delete(op.get('index'), force=op.get('force', False))
+
+    def _dispatch_insert(self, op: Dict, detail: Dict):
+        detail['new_index'] = self._op_insert(
+            op.get('index'),
+            op.get('text', ''),
+            op.get('position', 'after'),
+            op.get('style')
+        )
 
-                results['success'] += 1
+    def _dispatch_update_style(self, op: Dict, detail: Dict):
+        self._op_update_style(op.get('index'), op)
 
-            except Exception as e:
-                detail['status'] = 'error'
-                detail['error'] = str(e)
-                results['failed'] += 1
+    def _dispatch_replace_text(self, op: Dict, detail: Dict):
+        detail['changed'] = self._op_replace_text(
+            op.get('index'),
+            op.get('pattern', ''),
+            op.get('replacement', ''),
+            op.get('regex', True)
+        )
 
-            results['details'].append(detail)
+    def _dispatch_replace_text_global(self, op: Dict, detail: Dict):
+        detail['replaced_count'] = self._op_replace_text_global(
+            op.get('pattern', ''),
+            op.get('replacement', ''),
+            op.get('regex', False)
+        )
 
-        return results
+    def _dispatch_clean_xml(self, op: Dict, detail: Dict):
+        self._op_clean_xml(op.get('index'), op)
 
-    def save(self, path: Optional[str] = None):
-        """保存文档"""
-        self.doc.save(path or self.file_path)
+    def _dispatch_set_text(self, op: Dict, detail: Dict):
+        self._op_set_text(op.get('index'), op.get('text', ''))
+
+    def _dispatch_update_table_cell(self, op: Dict, detail: Dict):
+        self._op_update_table_cell(
+            op.get('table_index'),
+            op.get('row'),
+            op.get('col'),
+            op.get('text', '')
+        )
+        detail['table_index'] = op.get('table_index')
+        detail['row'] = op.get('row')
+        detail['col'] = op.get('col')
+
+    def _dispatch_replace_table_cell(self, op: Dict, detail: Dict):
+        changed = self._op_replace_table_cell(
+            op.get('table_index'),
+            op.get('row'),
+            op.get('col'),
+            op.get('pattern', ''),
+            op.get('replacement', ''),
+            op.get('regex', False)
+        )
+        detail['table_index'] = op.get('table_index')
+        detail['changed'] = changed
+
+    def _dispatch_update_table_row(self, op: Dict, detail: Dict):
+        self._op_update_table_row(
+            op.get('table_index'),
+            op.get('row'),
+            op.get('texts', [])
+        )
+        detail['table_index'] = op.get('table_index')
+        detail['row'] = op.get('row')
+
+    def _dispatch_update_table_col(self, op: Dict, detail: Dict):
+        self._op_update_table_col(
+            op.get('table_index'),
+            op.get('col'),
+            op.get('texts', [])
+        )
+        detail['table_index'] = op.get('table_index')
+        detail['col'] = op.get('col')
+
+    def _dispatch_delete_image(self, op: Dict, detail: Dict):
+        self._op_delete_image(op.get('image_index'))
+        detail['image_index'] = op.get('image_index')
+
+    def _dispatch_resize_image(self, op: Dict, detail: Dict):
+        self._op_resize_image(
+            op.get('image_index'),
+            op.get('width'),
+            op.get('height')
+        )
+        detail['image_index'] = op.get('image_index')
+
+    def _dispatch_insert_image(self, op: Dict, detail: Dict):
+        self._op_insert_image(
+            op.get('index'),
+            op.get('path', ''),
+            op.get('width'),
+            op.get('height')
+        )
+
+    def _dispatch_update_fields_on_open(self, op: Dict, detail: Dict):
+        self._op_update_fields_on_open()
 
     # ==================== 内部操作实现 ====================
 
@@ -584,37 +902,78 @@ class DocxEditor:
             force: 是否强制删除（即使包含图片等嵌入对象）
                    默认 False，会拒绝删除包含嵌入对象的段落
         """
-        if not 0 <= index < len(self._paragraphs):
+        self._check_delete(index, force)
+
+        p = self._p_elements[index]
+        p.getparent().remove(p)
+        del self._p_elements[index]
+        if force:
+            # 强制删除可能连带删除图片，图片索引下次访问时重建
+            self._images_cache = None
+
+    def _op_delete_range(self, start: int, stop: int, force: bool = False) -> List[Optional[Exception]]:
+        """
+        删除连续段落 [start, stop)
+
+        与从后往前逐个 _op_delete 等价：每个段落单独检查，失败的段落保留，
+        其余段落一次性移除并只更新一次段落索引。
+
+        Returns:
+            按索引从大到小排列的错误列表（成功为 None），与倒序执行的操作一一对应
+        """
+        # 删除较大索引不影响较小索引，因此可以先全部检查、再统一移除
+        errors = []
+        removed = set()
+        for index in range(stop - 1, start - 1, -1):
+            try:
+                self._check_delete(index, force)
+            except Exception as e:
+                errors.append(e)
+                continue
+            removed.add(index)
+            errors.append(None)
+
+        if removed:
+            p_elements = self._p_elements
+            for index in removed:
+                p = p_elements[index]
+                p.getparent().remove(p)
+            lo, hi = min(removed), max(removed) + 1
+            p_elements[lo:hi] = [p for i, p in enumerate(p_elements[lo:hi], lo) if i not in removed]
+            if force:
+                self._images_cache = None
+
+        return errors
+
+    def _check_delete(self, index: int, force: bool):
+        """删除前检查：索引范围，以及防止误删包含图片/OLE对象的段落"""
+        if not 0 <= index < len(self._p_elements):
             raise IndexError(f"索引超出范围: {index}")
-        para = self._paragraphs[index]
 
-        # 安全检查：防止误删包含图片/OLE对象的段落
-        if not force and not self._is_truly_empty(para):
+        if not force and not self._is_truly_empty(self._paragraph(index)):
             raise ValueError(
                 f"段落 {index} 包含嵌入对象（图片/OLE等），不能作为空段落删除。"
                 f"如确需删除，请使用 force=True"
             )
 
-        para._element.getparent().remove(para._element)
-        self._refresh()
-
     def _op_insert(self, index: int, text: str, position: str, style: Optional[str]) -> int:
         """插入段落"""
-        if not 0 <= index < len(self._paragraphs):
+        if not 0 <= index < len(self._p_elements):
             raise IndexError(f"索引超出范围: {index}")
 
-        ref_para = self._paragraphs[index]
+        ref_p = self._p_elements[index]
         new_p = OxmlElement('w:p')
 
         if position == 'before':
-            ref_para._element.addprevious(new_p)
+            ref_p.addprevious(new_p)
             new_idx = index
         else:
-            ref_para._element.addnext(new_p)
+            ref_p.addnext(new_p)
             new_idx = index + 1
 
-        self._refresh()
-        new_para = self._paragraphs[new_idx]
+        # 直接登记新元素，避免重新遍历整个文档
+        self._p_elements.insert(new_idx, new_p)
+        new_para = Paragraph(new_p, self.doc._body)
         new_para.add_run(text)
 
         if style:
@@ -627,10 +986,10 @@ class DocxEditor:
 
     def _op_update_style(self, index: int, op: Dict):
         """修改样式"""
-        if not 0 <= index < len(self._paragraphs):
+        if not 0 <= index < len(self._p_elements):
             raise IndexError(f"索引超出范围: {index}")
 
-        para = self._paragraphs[index]
+        para = self._paragraph(index)
 
         # 段落样式
         if 'style' in op:
@@ -681,7 +1040,7 @@ class DocxEditor:
                     if run._element.rPr is None:
                         run._element.get_or_add_rPr()
                     rFonts = run._element.rPr.get_or_add_rFonts()
-                    rFonts.set(qn('w:eastAsia'), f['name'])
+                    rFonts.set(_QN_EASTASIA, f['name'])
                 if 'size' in f:
                     run.font.size = Pt(f['size'])
                 if 'bold' in f:
@@ -691,16 +1050,12 @@ class DocxEditor:
 
     def _op_replace_text(self, index: int, pattern: str, replacement: str, regex: bool) -> bool:
         """替换单段落文本"""
-        if not 0 <= index < len(self._paragraphs):
+        if not 0 <= index < len(self._p_elements):
             raise IndexError(f"索引超出范围: {index}")
 
-        para = self._paragraphs[index]
+        para = self._paragraph(index)
         original = para.text
-
-        if regex:
-            new_text = re.sub(pattern, replacement, original)
-        else:
-            new_text = original.replace(pattern, replacement)
+        new_text = _compile_pattern(pattern, regex).sub(replacement, original)
 
         if new_text != original:
             self._set_paragraph_text(para, new_text)
@@ -709,31 +1064,111 @@ class DocxEditor:
 
     def _op_replace_text_global(self, pattern: str, replacement: str, regex: bool) -> int:
         """全局替换文本"""
-        count = 0
-        for para in self._paragraphs:
-            original = para.text
-            if regex:
-                new_text = re.sub(pattern, replacement, original)
-            else:
-                new_text = original.replace(pattern, replacement)
+        count, error = self._replace_text_global_many([(pattern, replacement, regex)])[0]
+        if error is not None:
+            raise error
+        return count
+
+    def _replace_text_global_many(self, replaces: List[Tuple[str, str, bool]]) -> List[Tuple[int, Optional[Exception]]]:
+        """
+        依次执行多个全局替换，只遍历一次段落
+
+        每个段落按顺序应用各替换，与逐个执行全局替换结果相同；
+        段落只要被任一替换改动，就只回写一次文本（写入后读回不一致的段落逐个替换重做）。
 
-            if new_text != original:
+        Args:
+            replaces: [(pattern, replacement, regex), ...]
+
+        Returns:
+            与 replaces 一一对应的 [(替换段落数, 错误或 None), ...]
+        """
+        counts = [0] * len(replaces)
+        errors = [None] * len(replaces)
+        steps = []
+        for k, (pattern, replacement, regex) in enumerate(replaces):
+            try:
+                matcher = _compile_pattern(pattern, regex)
+                # 提前触发模式/替换模板的错误，出错的替换单独报错，不影响其它替换
+                matcher.sub(replacement, '')
+            except Exception as e:
+                errors[k] = e
+                continue
+            steps.append((k, matcher, replacement))
+
+        body = self.doc._body
+        for p in self._p_elements:
+            if not steps:
+                break
+            original = text = p.text
+            hits = []
+            stable = True
+            for k, matcher, replacement in steps:
+                # 多数段落不命中：先用 search 判断，命中才构造替换结果
+                if not matcher.search(text):
+                    continue
+                new_text = matcher.sub(replacement, text)
+                if new_text != text:
+                    hits.append(k)
+                    text = new_text
+                    if stable and _UNSTABLE_TEXT.search(new_text):
+                        stable = False
+
+            if not hits:
+                continue
+            para = Paragraph(p, body)
+            # 合并回写的前提：写入后读回的文本与写入的相同。超链接中的文本不会被改写、
+            # \r 读回为 \n、非法字符写入失败，这些情况下逐个执行的中间结果与链式计算不同
+            if stable and p.find(_QN_HYPERLINK) is None:
+                try:
+                    self._set_paragraph_text(para, text)
+                except Exception:
+                    pass
+                else:
+                    if p.text == text:
+                        for k in hits:
+                            counts[k] += 1
+                        continue
+            # 逐个替换重做该段落（每次回写后重新读取文本），与逐个执行的结果一致；
+            # 出错的替换记为失败并不再处理后续段落
+            self._replay_replaces(para, original, steps, counts, errors)
+            steps = [step for step in steps if errors[step[0]] is None]
+
+        return list(zip(counts, errors))
+
+    def _replay_replaces(self, para, text: str, steps: List, counts: List[int], errors: List):
+        """
+        对单个段落逐个应用替换并逐次回写，记录每个替换的命中数或错误
+
+        每次回写后重新读取段落文本（与逐个执行全局替换时看到的文本一致）。
+        此前若已有合并回写，第一次回写会覆盖首个 run 并清空其余 run，结果不受影响。
+        """
+        for k, matcher, replacement in steps:
+            if not matcher.search(text):
+                continue
+            new_text = matcher.sub(replacement, text)
+            if new_text == text:
+                continue
+            try:
                 self._set_paragraph_text(para, new_text)
-                count += 1
-        return count
+            except Exception as e:
+                errors[k] = e
+            else:
+                counts[k] += 1
+            # 回写后（包括失败时的部分改写）以段落实际文本为准
+            text = para.text
 
     def _op_clean_xml(self, index: int, op: Dict):
         """清理XML属性"""
-        if not 0 <= index < len(self._paragraphs):
+        if not 0 <= index < len(self._p_elements):
             raise IndexError(f"索引超出范围: {index}")
 
-        para = self._paragraphs[index]
+        para = self._paragraph(index)
         remove_list = op.get('remove', [])
 
         pPr = para._element.pPr
         if pPr is not None:
             for tag in remove_list:
-                elem = pPr.find(qn(f'w:{tag}'))
+                elem = pPr.find(_qn_w(tag))
                 if elem is not None:
                     pPr.remove(elem)
 
@@ -755,10 +1190,10 @@ class DocxEditor:
 
     def _op_set_text(self, index: int, text: str):
         """设置段落文本"""
-        if not 0 <= index < len(self._paragraphs):
+        if not 0 <= index < len(self._p_elements):
             raise IndexError(f"索引超出范围: {index}")
 
-        para = self._paragraphs[index]
+        para = self._paragraph(index)
         self._set_paragraph_text(para, text)
 
     # ==================== 表格操作实现 ====================
@@ -792,11 +1227,7 @@ class DocxEditor:
 
         cell = table.cell(row, col)
         original = cell.text
-
-        if regex:
-            new_text = re.sub(pattern, replacement, original)
-        else:
-            new_text = original.replace(pattern, replacement)
+        new_text = _compile_pattern(pattern, regex).sub(replacement, original)
 
         if new_text != original:
             cell.text = new_text
@@ -812,9 +1243,11 @@ class DocxEditor:
         if not 0 <= row < len(table.rows):
             raise IndexError(f"行索引超出范围: {row}")
 
-        for col, text in enumerate(texts):
-            if col < len(table.columns):
-                table.cell(row, col).text = text
+        # table.cell() 每次调用都会重新解析整表的合并单元格，这里只解析一次该行
+        col_count = len(table.columns)
+        row_cells = table._cells[row * col_count:(row + 1) * col_count]
+        for cell, text in zip(row_cells, texts):
+            cell.text = text
 
     def _op_update_table_col(self, table_index: int, col: int, texts: List[str]):
         """批量修改表格整列"""
@@ -825,9 +1258,9 @@ class DocxEditor:
         if not 0 <= col < len(table.columns):
             raise IndexError(f"列索引超出范围: {col}")
 
-        for row, text in enumerate(texts):
-            if row < len(table.rows):
-                table.cell(row, col).text = text
+        # 一次性解析整列单元格，避免逐行调用 table.cell() 重复解析整表
+        for cell, text in zip(table.column_cells(col), texts):
+            cell.text = text
 
     # ==================== 图片操作实现 ====================
 
@@ -838,7 +1271,7 @@ class DocxEditor:
 
         shape = self._images[image_index]
         shape._inline.getparent().remove(shape._inline)
-        self._refresh()
+        del self._images[image_index]
 
     def _op_resize_image(self, image_index: int, width: Optional[float], height: Optional[float]):
         """调整图片大小（单位：厘米）"""
@@ -853,23 +1286,25 @@ class DocxEditor:
             shape.height = Cm(height)
         elif width is not None:
             # 只指定宽度，按比例调整高度
-            ratio = shape.height / shape.width if shape.width else 1
+            cx, cy = self._image_extent(shape)
+            ratio = cy / cx if cx else 1
             shape.width = Cm(width)
             shape.height = int(Cm(width) * ratio)
         elif height is not None:
             # 只指定高度，按比例调整宽度
-            ratio = shape.width / shape.height if shape.height else 1
+            cx, cy = self._image_extent(shape)
+            ratio = cx / cy if cy else 1
             shape.height = Cm(height)
             shape.width = int(Cm(height) * ratio)
 
     def _op_insert_image(self, index: int, path: str, width: Optional[float], height: Optional[float]):
         """在段落中插入图片"""
-        if not 0 <= index < len(self._paragraphs):
+        if not 0 <= index < len(self._p_elements):
             raise IndexError(f"索引超出范围: {index}")
         if not os.path.exists(path):
             raise FileNotFoundError(f"图片文件不存在: {path}")
 
-        para = self._paragraphs[index]
+        para = self._paragraph(index)
         run = para.add_run()
 
         # 插入图片
@@ -882,7 +1317,7 @@ class DocxEditor:
         else:
             picture = run.add_picture(path)
 
-        self._refresh()
+        self._images_cache = None
 
     # ==================== 引用刷新实现 ====================
 
@@ -896,18 +1331,63 @@ class DocxEditor:
         settings = self.doc.settings.element
 
         # 检查是否已存在 updateFields 元素
-        update_fields = settings.find(qn('w:updateFields'))
+        update_fields = settings.find(_QN_UPDATEFIELDS)
         if update_fields is None:
             # 创建新元素
             update_fields = OxmlElement('w:updateFields')
-            update_fields.set(qn('w:val'), 'true')
+            update_fields.set(_QN_VAL, 'true')
             settings.append(update_fields)
         else:
             # 更新现有元素
-            update_fields.set(qn('w:val'), 'true')
+            update_fields.set(_QN_VAL, 'true')
 
     # ==================== 内部辅助 ====================
 
+    @staticmethod
+    def _style_id(p) -> Optional[str]:
+        """直接读取段落 pPr/pStyle 的 w:val（未指定样式时为 None）"""
+        pStyle = p.find(_PSTYLE_PATH)
+        return pStyle.get(_QN_VAL) if pStyle is not None else None
+
+    def _style_name(self, p) -> Optional[str]:
+        """段落样式名称（按 pStyle 值缓存并驻留字符串，不经过 para.style 查找）"""
+        style_id = self._style_id(p)
+        try:
+            return self._style_name_cache[style_id]
+        except KeyError:
+            pass
+        style = self.doc.part.get_style(style_id, WD_STYLE_TYPE.PARAGRAPH)
+        name = style.name if style else None
+        if name is not None:
+            name = sys.intern(name)
+        self._style_name_cache[style_id] = name
+        return name
+
+    def _image_extent(self, shape) -> Tuple[int, int]:
+        """直接读取 <wp:extent> 的 cx/cy 属性，返回图片宽高（EMU）"""
+        extent = shape._inline.find(_QN_EXTENT)
+        return int(extent.get('cx')), int(extent.get('cy'))
+
+    @staticmethod
+    def _delete_run_length(ops: List[Dict], pos: int) -> int:
+        """从 pos 起，索引逐一递减且 force 一致的连续 delete 操作个数"""
+        first = ops[pos]
+        if first.get('op') != 'delete' or not isinstance(first.get('index'), int):
+            return 0
+
+        force = bool(first.get('force', False))
+        end = pos + 1
+        while end < len(ops):
+            op = ops[end]
+            index = op.get('index')
+            if (op.get('op') != 'delete'
+                    or not isinstance(index, int)
+                    or index != ops[end - 1]['index'] - 1
+                    or bool(op.get('force', False)) != force):
+                break
+            end += 1
+        return end - pos
+
     def _is_truly_empty(self, para) -> bool:
         """
         判断段落是否真正为空（无文字且无图片等嵌入对象）
@@ -919,56 +1399,145 @@ class DocxEditor:
             True: 段落真正为空，可以安全删除
             False: 段落包含嵌入对象，不应作为"空段落"删除
         """
-        # 有文字则不是空段落
-        if para.text.strip() != "":
-            return False
-
-        # 检查是否包含图片（drawing 元素）
-        drawings = para._element.findall('.//' + qn('w:drawing'))
-        if len(drawings) > 0:
-            return False
-
-        # 检查是否包含 OLE 对象（如嵌入的 Excel、公式等）
-        objects = para._element.findall('.//' + qn('w:object'))
-        if len(objects) > 0:
-            return False
-
-        # 检查是否包含图表（Chart 命名空间）
-        # 使用通配符匹配，因为图表可能在不同命名空间下
-        for child in para._element.iter():
-            if 'chart' in child.tag.lower():
-                return False
+        p = para._element
+        try:
+            return self._truly_empty_cache[p]
+        except KeyError:
+            pass
+
+        # 有文字则不是空段落；图片、OLE 对象、图表任一存在也不算空段落
+        empty = not para.text.strip() and not self._scan_embedded(p)[1]
+        self._truly_empty_cache[p] = empty
+        return empty
+
+    @staticmethod
+    def _scan_embedded(p) -> Tuple[bool, bool]:
+        """
+        单次遍历段落，检查嵌入对象
 
-        return True
+        Returns:
+            (是否包含 drawing/OLE 对象, 是否包含 drawing/OLE 对象或图表)
+        """
+        # 无子元素或只有 <w:pPr> 的段落不可能包含嵌入对象，无需遍历
+        n = len(p)
+        if n == 0 or (n == 1 and p[0].tag == _QN_PPR):
+            return False, False
+
+        has_chart = False
+        for child in p.iter():
+            tag = child.tag
+            # 图片（drawing 元素）或 OLE 对象（如嵌入的 Excel、公式等）
+            if tag in _EMBED_TAGS:
+                return True, True
+            # 图表（Chart 命名空间），使用通配符匹配，因为图表可能在不同命名空间下；
+            # OOXML 命名空间均为小写，无需 lower()。注释/处理指令的 tag 不是字符串，跳过
+            if not has_chart and isinstance(tag, str) and 'chart' in tag:
+                has_chart = True
+        return False, has_chart
 
     def _get_heading_level(self, para) -> Optional[int]:
-        """获取标题级别"""
-        if not para.style:
-            return None
-        name = para.style.name
-        style_id = para.style.style_id
+        """获取标题级别（查样式级别表，不解析样式名称）"""
+        levels, default_level = self._style_levels
+        return levels.get(self._style_id(para._element), default_level)
 
-        if name.startswith('Heading'):
-            try:
-                return int(name.split()[-1])
-            except:
-                pass
+    def _style_heading_level(self, style) -> Optional[int]:
+        """根据段落样式获取标题级别"""
+        if not style:
+            return None
+        # styles.xml 中的样式可以没有 <w:name>（name 为 None），此时只按样式 ID 判断
+        name = style.name
+        if name:
+            level = _HEADING_LEVELS.get(name)
+            if level is not None:
+                return level
+            if name.startswith('Heading'):
+                tail = name.split()[-1]
+                if tail.isdecimal():
+                    return int(tail)
+
+        style_id = style.style_id
         if style_id and style_id.isdigit() and int(style_id) <= 9:
             return int(style_id)
         return None
 
+    def _get_heading_index(self) -> Tuple[int, List[Tuple[int, int, str]]]:
+        """
+        获取标题索引（单次遍历构建并缓存，修改后重建）
+
+        先确定哪些样式是标题样式，再用预编译 XPath 一次性筛出使用这些样式的段落，
+        不构造 Paragraph 对象，非标题段落不拼接文本。
+
+        Returns:
+            (段落总数, [(段落索引, 标题级别, 段落文本), ...])
+        """
+        if self._headings_cache is not None:
+            return self._headings_cache
+
+        levels, default_level = self._style_levels
+        p_elements = self._p_elements
+
+        if default_level:
+            # 默认段落样式本身是标题（罕见）：所有段落都是候选
+            candidates = p_elements
+        elif any(levels.values()):
+            ids = '|' + '|'.join(style_id for style_id, level in levels.items() if level) + '|'
+            candidates = _XP_STYLED_PARAGRAPHS(self.doc.element.body, ids=ids)
+        else:
+            candidates = []
+
+        headings = []
+        if candidates:
+            # 段落元素 -> 索引（在 C 层一次构建），候选段落直接查表得到索引
+            position = dict(zip(p_elements, range(len(p_elements))))
+            for p in candidates:
+                level = levels.get(self._style_id(p), default_level)
+                if level:
+                    headings.append((position[p], level, _paragraph_text(p)))
+
+        self._headings_cache = (len(self._p_elements), headings)
+        return self._headings_cache
+
+    @property
+    def _style_levels(self) -> Tuple[Dict[str, Optional[int]], Optional[int]]:
+        """
+        (段落样式 ID -> 标题级别, 默认段落样式的标题级别)
+
+        每个文档只构建一次（批量操作不会修改样式定义）。非标题样式为 None；
+        同一 ID 以第一个定义为准，且只收录段落样式，与 python-docx 的样式查找一致；
+        未指定样式或不在表中的 ID 按默认段落样式处理。
+        """
+        if self._style_levels_cache is None:
+            default_level = self._style_heading_level(self.doc.styles.default(WD_STYLE_TYPE.PARAGRAPH))
+            self._style_levels_cache = (self._paragraph_style_levels(), default_level)
+        return self._style_levels_cache
+
+    def _paragraph_style_levels(self) -> Dict[str, Optional[int]]:
+        """遍历样式定义，构建段落样式 ID -> 标题级别表"""
+        levels = {}
+        seen = set()
+        for style in self.doc.styles:
+            style_id = style.style_id
+            if style_id is None or style_id in seen:
+                continue
+            seen.add(style_id)
+            if style.type == WD_STYLE_TYPE.PARAGRAPH:
+                levels[style_id] = self._style_heading_level(style)
+        return levels
+
     def _get_section_indices(self, section_title: str) -> List[int]:
         """获取章节内所有段落索引"""
-        for i, para in enumerate(self._paragraphs):
-            level = self._get_heading_level(para)
-            if level and section_title in para.text:
-                end = len(self._paragraphs)
-                for j in range(i + 1, len(self._paragraphs)):
-                    next_level = self._get_heading_level(self._paragraphs[j])
-                    if next_level and next_level <= level:
-                        end = j
+        # 只在标题索引中查找起止位置，不逐段落扫描
+        total, headings = self._get_heading_index()
+        it = iter(headings)
+        for start, level, text in it:
+            if section_title in text:
+                # 从命中位置继续推进同一迭代器，不复制剩余标题列表
+                end = total
+                for next_index, next_level, _ in it:
+                    if next_level <= level:
+                        end = next_index
                         break
-                return list(range(i, end))
+                return list(range(start, end))
         return []
 
     def _set_paragraph_text(self, para, text: str):
@@ -984,20 +1553,12 @@ class DocxEditor:
         """对齐方式转字符串"""
         if alignment is None:
             return None
-        alignment_map = {
-            WD_ALIGN_PARAGRAPH.LEFT: 'left',
-            WD_ALIGN_PARAGRAPH.CENTER: 'center',
-            WD_ALIGN_PARAGRAPH.RIGHT: 'right',
-            WD_ALIGN_PARAGRAPH.JUSTIFY: 'justify',
-        }
-        return alignment_map.get(alignment)
+        return _ALIGN_MAP.get(alignment)
 
 
 # ==================== 命令行测试 ====================
 
 def main():
-    import sys
-
     if len(sys.argv) < 2:
         print("用法: python docx_editor.py <file.docx> [outline|read|tables|table|images]")
         return
@@ -1005,38 +1566,44 @@ def main():
     editor = DocxEditor(sys.argv[1])
     cmd = sys.argv[2] if len(sys.argv) > 2 else 'outline'
 
+    # 先拼接所有输出行，最后一次性写出，避免逐行 print
+    lines = []
+
     if cmd == 'outline':
-        outline = editor.get_outline()
-        print(f"\n文档大纲（共 {outline['total']} 段落）\n" + "=" * 50)
-        for h in outline['headings']:
+        # 逐个取标题，不构造完整的大纲列表
+        lines.append(f"\n文档大纲（共 {editor.paragraph_count} 段落）\n" + "=" * 50)
+        for h in editor.iter_outline():
             indent = '  ' * (h['level'] - 1)
-            print(f"{indent}[{h['index']:3d}] H{h['level']}: {h['text'][:50]}")
+            lines.append(f"{indent}[{h['index']:3d}] H{h['level']}: {h['text'][:50]}")
 
     elif cmd == 'read':
-        indices = [int(x) for x in sys.argv[3].split(',')] if len(sys.argv) > 3 else [0, 1, 2]
-        content = editor.read_content(indices)
-        for p in content:
-            print(f"\n[{p['index']}] {p['style']} | empty={p['is_empty']} | numPr={p['xml']['has_numPr']}")
-            print(f"  {p['text'][:80]}...")
+        # 去重并按顺序读取
+        indices = sorted({int(x) for x in sys.argv[3].split(',')}) if len(sys.argv) > 3 else [0, 1, 2]
+        for p in editor.iter_summaries(indices):
+            lines.append(f"\n[{p.index}] {p.style} | empty={p.is_empty} | numPr={p.has_numPr}")
+            lines.append(f"  {p.text[:80]}...")
 
     elif cmd == 'tables':
         tables = editor.get_tables_outline()
-        print(f"\n表格概览（共 {len(tables)} 个表格）\n" + "=" * 50)
+        lines.append(f"\n表格概览（共 {len(tables)} 个表格）\n" + "=" * 50)
         for t in tables:
-            print(f"[{t['table_index']}] {t['rows']}行 x {t['cols']}列 | {t['preview']}")
+            lines.append(f"[{t['table_index']}] {t['rows']}行 x {t['cols']}列 | {t['preview']}")
 
     elif cmd == 'table':
         table_index = int(sys.argv[3]) if len(sys.argv) > 3 else 0
         table = editor.read_table(table_index)
-        print(f"\n表格 {table_index}（{table['rows']}行 x {table['cols']}列）\n" + "=" * 50)
+        lines.append(f"\n表格 {table_index}（{table['rows']}行 x {table['cols']}列）\n" + "=" * 50)
         for i, row in enumerate(table['data']):
-            print(f"[{i}] {' | '.join(cell[:20] for cell in row)}")
+            lines.append(f"[{i}] {' | '.join(cell[:20] for cell in row)}")
 
     elif cmd == 'images':
         images = editor.get_images_outline()
-        print(f"\n图片概览（共 {len(images)} 张图片）\n" + "=" * 50)
+        lines.append(f"\n图片概览（共 {len(images)} 张图片）\n" + "=" * 50)
         for img in images:
-            print(f"[{img['image_index']}] {img['type']} | {img['width_cm']}cm x {img['height_cm']}cm")
+            lines.append(f"[{img['image_index']}] {img['type']} | {img['width_cm']}cm x {img['height_cm']}cm")
+
+    if lines:
+        sys.stdout.write('\n'.join(lines) + '\n')
 
 
 if __name__ == '__main__':